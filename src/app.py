@@ -3,118 +3,341 @@ Aplicación Flask para el servicio de diagnóstico médico
 Desarrollado para el taller de Pipeline de MLOps + Docker
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
+import atexit
+import heapq
 import json
 import logging
 import os
+import queue
+import threading
 from datetime import datetime, timezone
 from collections import Counter
-import pytz
+from operator import itemgetter
+from typing import Any
+from zoneinfo import ZoneInfo
+import msgspec
+import orjson
+from flask_orjson import OrjsonProvider
+from jinja2 import FileSystemBytecodeCache
 from model import predict_medical_diagnosis
 
-# Configuración de logging
-logging.basicConfig(level=logging.INFO)
+# Configuración de logging (nivel configurable, p. ej. LOG_LEVEL=WARNING en producción)
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper())
 logger = logging.getLogger(__name__)
 
 # Crear aplicación Flask
 app = Flask(__name__)
 
-# Configuración de la aplicación
-app.config['JSON_SORT_KEYS'] = False
-app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
+# Configuración de la aplicación: serialización JSON con orjson (sin pretty-print
+# ni ordenamiento de claves). Se habilita soporte nativo para tipos NumPy.
+JSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+app.json = OrjsonProvider(app)
+app.json.option = JSON_OPTIONS
+
+# Caché de bytecode de Jinja en disco (directorio temporal por usuario): cada
+# worker nuevo carga las plantillas ya compiladas
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+
+
+def _json_response(obj, status: int = 200) -> Response:
+    """Respuesta JSON serializada directamente con orjson (sin pasar por jsonify)."""
+    return app.response_class(
+        orjson.dumps(obj, option=JSON_OPTIONS), status=status, mimetype='application/json'
+    )
 
 # Rutas y utilidades para registro de predicciones
 LOG_DIR = os.path.join(os.path.dirname(__file__), 'data')
 LOG_FILE = os.path.join(LOG_DIR, 'predictions_log.jsonl')
-COL_TZ = pytz.timezone('America/Bogota')
+COL_TZ = ZoneInfo('America/Bogota')
+
+
+# Último LOG_DIR ya creado; evita repetir makedirs mientras la ruta no cambie
+_log_dir_ready = None
 
 
 def _ensure_log_dir() -> None:
-    if not os.path.exists(LOG_DIR):
-        os.makedirs(LOG_DIR, exist_ok=True)
+    global _log_dir_ready
+    if _log_dir_ready == LOG_DIR:
+        return
+    os.makedirs(LOG_DIR, exist_ok=True)
+    _log_dir_ready = LOG_DIR
+
+
+# Escritor en segundo plano: un único hilo mantiene el archivo abierto y
+# escribe las líneas pendientes por lotes (evita open/write/close por request).
+LOG_QUEUE = queue.Queue()
+LOG_BATCH_SIZE = 256
+LOG_BUFFER_SIZE = 1 << 20
+# Espera máxima (s) de los reportes a que el escritor vacíe la cola
+LOG_FLUSH_TIMEOUT = 2.0
+_log_writer = None
+_log_writer_lock = threading.Lock()
+
+
+def _prediction_log_writer() -> None:
+    """Consume LOG_QUEUE y escribe cada lote con un solo write + flush."""
+    handle = None
+    handle_path = None
+    while True:
+        batch = [LOG_QUEUE.get()]
+        try:
+            while len(batch) < LOG_BATCH_SIZE:
+                batch.append(LOG_QUEUE.get_nowait())
+        except queue.Empty:
+            pass
+
+        # Los marcadores de _flush_prediction_log se separan de las líneas
+        lines = [item for item in batch if isinstance(item, bytes)]
+        markers = [item for item in batch if not isinstance(item, bytes)]
+        try:
+            # Reabrimos si LOG_FILE cambió (p. ej. redirigido en pruebas)
+            if handle is None or handle_path != LOG_FILE:
+                if handle is not None:
+                    handle.close()
+                _ensure_log_dir()
+                handle_path = LOG_FILE
+                handle = open(handle_path, 'ab', buffering=LOG_BUFFER_SIZE)
+            if lines:
+                handle.write(b"".join(lines))
+                handle.flush()
+        except Exception as e:
+            logger.error("No se pudo escribir en el log de predicciones: %s", e)
+            # Se descarta el handle (se reabre en el próximo lote) sin filtrar el descriptor
+            if handle is not None:
+                try:
+                    handle.close()
+                except Exception:
+                    pass
+            handle = None
+        finally:
+            # Todo lo encolado antes de cada marcador ya está en disco
+            for marker in markers:
+                marker.set()
+            for _ in batch:
+                LOG_QUEUE.task_done()
+
+
+def _start_log_writer() -> None:
+    """Arranca el hilo escritor la primera vez que se necesita."""
+    global _log_writer
+    # Camino rápido sin lock: el hilo ya está corriendo
+    if _log_writer is not None and _log_writer.is_alive():
+        return
+    with _log_writer_lock:
+        if _log_writer is None or not _log_writer.is_alive():
+            _log_writer = threading.Thread(
+                target=_prediction_log_writer, name='prediction-log-writer', daemon=True
+            )
+            _log_writer.start()
+
+
+def _flush_prediction_log() -> None:
+    """
+    Bloquea hasta que las predicciones encoladas antes de la llamada estén en
+    disco, como máximo LOG_FLUSH_TIMEOUT segundos. Se encola un marcador en vez
+    de usar LOG_QUEUE.join(), que con tráfico sostenido en /predict podría no
+    volver nunca; el límite evita que una escritura trabada cuelgue los reportes.
+    """
+    if _log_writer is not None and _log_writer.is_alive():
+        done = threading.Event()
+        LOG_QUEUE.put(done)
+        if not done.wait(LOG_FLUSH_TIMEOUT):
+            logger.warning(
+                "El log de predicciones no se vació en %.1fs; el reporte puede estar incompleto",
+                LOG_FLUSH_TIMEOUT,
+            )
+
+
+atexit.register(_flush_prediction_log)
 
 
 def _append_prediction_log(entry: dict) -> None:
-    """Agrega una predicción al log como JSONL (1 línea por predicción)."""
+    """Encola una predicción para el log JSONL (1 línea por predicción)."""
     try:
-        _ensure_log_dir()
-        with open(LOG_FILE, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        line = orjson.dumps(entry, option=JSON_OPTIONS) + b"\n"
+        _start_log_writer()
+        LOG_QUEUE.put(line)
     except Exception as e:
-        logger.error(f"No se pudo escribir en el log de predicciones: {str(e)}")
+        logger.error("No se pudo registrar la predicción en el log: %s", e)
+
+
+class LogEntry(msgspec.Struct):
+    """
+    Esquema de una línea del log de predicciones. Decodificar directo a este
+    Struct (con __slots__) evita crear un dict por entrada al leer el log.
+    Los campos no se validan por tipo: toda línea JSON que sea un objeto se
+    cuenta en el reporte, aunque algún valor tenga un tipo inesperado.
+    """
+    timestamp: Any = None
+    diagnosis: Any = None
+    confidence: Any = None
+    severity_score: Any = None
+    most_likely_condition: Any = None
+    input_symptoms: Any = None
+
+
+_LOG_ENTRY_DECODER = msgspec.json.Decoder(LogEntry)
 
 
-def _read_prediction_log() -> list:
-    """Lee el archivo JSONL y devuelve la lista de entradas (puede ser vacía)."""
-    if not os.path.exists(LOG_FILE):
-        return []
+def _read_prediction_log(offset: int = 0) -> tuple:
+    """
+    Lee el archivo JSONL a partir de `offset` (bytes) y devuelve
+    (entradas LogEntry, nuevo_offset). Solo se consumen líneas completas.
+    """
     entries = []
     try:
-        with open(LOG_FILE, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    entries.append(json.loads(line))
-                except json.JSONDecodeError:
-                    logger.warning("Línea inválida en log de predicciones; se ignora")
+        with open(LOG_FILE, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
     except Exception as e:
-        logger.error(f"No se pudo leer el log de predicciones: {str(e)}")
-    return entries
+        logger.error("No se pudo leer el log de predicciones: %s", e)
+        return entries, offset
+
+    # Una línea a medio escribir (sin salto final) se leerá en la próxima pasada
+    end = data.rfind(b"\n") + 1
+    for line in data[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            entries.append(_LOG_ENTRY_DECODER.decode(line))
+        except msgspec.DecodeError:
+            # Líneas antiguas escritas con json.dumps pueden traer NaN/Infinity,
+            # que solo acepta el parser estándar
+            try:
+                entries.append(msgspec.convert(json.loads(line), LogEntry))
+            except (ValueError, msgspec.ValidationError):
+                logger.warning("Línea inválida en log de predicciones; se ignora")
+    offset += end
+    return entries, offset
+
+
+_MIN_TS = datetime.min.replace(tzinfo=timezone.utc)
+_fromisoformat = datetime.fromisoformat
+
+
+def _parse_ts(e: LogEntry) -> datetime:
+    """Parseo seguro de timestamps (ISO-8601) para ordenar entradas."""
+    ts = e.timestamp
+    try:
+        # fromisoformat admite sufijo +00:00; si viene con Z, normalizamos
+        if isinstance(ts, str) and ts.endswith('Z'):
+            ts = ts[:-1] + '+00:00'
+        dt = _fromisoformat(ts)
+    except Exception:
+        return _MIN_TS
+    # Timestamps sin zona se asumen en UTC (comparables con los que sí la tienen)
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
+
+
+def _diagnosis_key(e: LogEntry) -> str:
+    """Categoría con la que se cuenta una entrada (siempre un str serializable)."""
+    if e.diagnosis is None:
+        return 'DESCONOCIDO'
+    return e.diagnosis if isinstance(e.diagnosis, str) else str(e.diagnosis)
+
+
+def _compact_entry(dt: datetime, e: LogEntry) -> dict:
+    """Versión resumida de una entrada para el reporte, con hora local de Colombia."""
+    raw_ts = e.timestamp
+    try:
+        # Equivale a strftime('%Y-%m-%d %H:%M:%S'), sin sufijo de zona
+        dt_col = dt.astimezone(COL_TZ).replace(tzinfo=None)
+        local_ts_str = dt_col.isoformat(sep=' ', timespec='seconds')
+    except Exception:
+        local_ts_str = raw_ts
+
+    return {
+        'timestamp': raw_ts,
+        'timestamp_local': local_ts_str,
+        'diagnosis': e.diagnosis,
+        'most_likely_condition': e.most_likely_condition,
+        'confidence': e.confidence,
+    }
+
+
+# Caché incremental del reporte: conteos y últimas 5 predicciones se actualizan
+# solo con las líneas nuevas del log (desde `offset`), sin releer el historial.
+# 'recent' guarda pares ((timestamp parseado, nº de línea), entrada resumida),
+# de la más reciente a la más antigua; cada entrada se parsea y se resume una
+# sola vez. El nº de línea ('seq') desempata timestamps iguales o inválidos a
+# favor de la línea escrita más tarde.
+_REPORT_CACHE = {
+    'path': None,
+    'offset': 0,
+    'seq': 0,
+    'counter': Counter(),
+    'recent': [],
+}
+_report_cache_lock = threading.Lock()
+
+
+def _reset_report_cache() -> None:
+    """Descarta el estado acumulado (se recalcula desde el inicio del log)."""
+    _REPORT_CACHE['path'] = LOG_FILE
+    _REPORT_CACHE['offset'] = 0
+    _REPORT_CACHE['seq'] = 0
+    _REPORT_CACHE['counter'] = Counter()
+    _REPORT_CACHE['recent'] = []
+
+
+def _refresh_report_cache() -> dict:
+    """
+    Incorpora al caché las entradas añadidas desde la última lectura y
+    devuelve una copia con 'counter' y 'recent'.
+    """
+    _flush_prediction_log()
+    with _report_cache_lock:
+        try:
+            size = os.stat(LOG_FILE).st_size
+        except OSError:
+            size = 0
+
+        # Invalidación: cambió la ruta del log o el archivo se truncó
+        if _REPORT_CACHE['path'] != LOG_FILE or size < _REPORT_CACHE['offset']:
+            _reset_report_cache()
+
+        if size > _REPORT_CACHE['offset']:
+            new_entries, offset = _read_prediction_log(_REPORT_CACHE['offset'])
+            _REPORT_CACHE['offset'] = offset
+            if new_entries:
+                _REPORT_CACHE['counter'].update(_diagnosis_key(e) for e in new_entries)
+                # Top-5 por timestamp en O(N log 5); solo las entradas nuevas que
+                # quedan en el top se resumen (las ya cacheadas se reutilizan)
+                seq = _REPORT_CACHE['seq']
+                candidates = [(key, compact, None) for key, compact in _REPORT_CACHE['recent']]
+                candidates.extend(
+                    ((_parse_ts(e), seq + i), None, e) for i, e in enumerate(new_entries)
+                )
+                _REPORT_CACHE['seq'] = seq + len(new_entries)
+                _REPORT_CACHE['recent'] = [
+                    (key, compact if compact is not None else _compact_entry(key[0], e))
+                    for key, compact, e in heapq.nlargest(5, candidates, key=itemgetter(0))
+                ]
 
+        return {
+            # Identifica el estado del caché: cambia con cada línea nueva del log
+            'version': (_REPORT_CACHE['path'], _REPORT_CACHE['offset']),
+            'counter': Counter(_REPORT_CACHE['counter']),
+            'recent': [compact for _, compact in _REPORT_CACHE['recent']],
+        }
 
-def _compute_prediction_stats(entries: list) -> dict:
-    """Calcula estadísticas requeridas a partir de la lista de entradas."""
-    if not entries:
+
+def _compute_prediction_stats(cache: dict) -> dict:
+    """Arma las estadísticas requeridas a partir del caché del reporte."""
+    if not cache['recent']:
         return {
             'counts_by_category': {},
             'last_5_predictions': [],
             'last_prediction_date': None
         }
 
-    # Parseo seguro de timestamps (ISO-8601) y orden
-    def parse_ts(e):
-        ts = e.get('timestamp')
-        try:
-            # fromisoformat admite sufijo +00:00; si viene con Z, normalizamos
-            if isinstance(ts, str) and ts.endswith('Z'):
-                ts = ts[:-1] + '+00:00'
-            return datetime.fromisoformat(ts)
-        except Exception:
-            return datetime.min.replace(tzinfo=timezone.utc)
-
-    entries_sorted = sorted(entries, key=parse_ts)
-
-    # Conteos por categoría (diagnosis)
-    diagnoses = [e.get('diagnosis', 'DESCONOCIDO') for e in entries_sorted]
-    counts = dict(Counter(diagnoses))
-
-    # Últimas 5 predicciones (más recientes)
-    last_5 = entries_sorted[-5:][::-1]
-    last_5_compact = []
-    for e in last_5:
-        raw_ts = e.get('timestamp')
-        local_ts_str = None
-        try:
-            ts_str = raw_ts
-            if isinstance(ts_str, str) and ts_str.endswith('Z'):
-                ts_str = ts_str[:-1] + '+00:00'
-            dt = datetime.fromisoformat(ts_str)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            dt_col = dt.astimezone(COL_TZ)
-            local_ts_str = dt_col.strftime('%Y-%m-%d %H:%M:%S')
-        except Exception:
-            local_ts_str = raw_ts
-
-        last_5_compact.append({
-            'timestamp': raw_ts,
-            'timestamp_local': local_ts_str,
-            'diagnosis': e.get('diagnosis'),
-            'most_likely_condition': e.get('most_likely_condition'),
-            'confidence': e.get('confidence'),
-        })
+    # Conteos por categoría (diagnosis); el Counter ya es una copia y se
+    # serializa igual que un dict
+    counts = cache['counter']
+
+    # Últimas 5 predicciones (ya resumidas, de la más reciente a la más antigua)
+    last_5_compact = [dict(compact) for compact in cache['recent']]
 
     # Fecha de la última predicción
     last_date = last_5_compact[0]['timestamp'] if last_5_compact else None
@@ -127,6 +350,93 @@ def _compute_prediction_stats(entries: list) -> dict:
         'last_prediction_date_local': last_date_local
     }
 
+# Último HTML de /report renderizado, como (versión del caché, html)
+_report_html_cache = None
+
+
+def reset_report() -> None:
+    """
+    Reinicia todo el estado en memoria del reporte (caché incremental y HTML
+    renderizado); el siguiente acceso se recalcula desde el log actual.
+    """
+    global _report_html_cache
+    with _report_cache_lock:
+        _reset_report_cache()
+    _report_html_cache = None
+
+# Respuestas estáticas: se serializan una sola vez al cargar el módulo.
+# /health no lleva Cache-Control para que los monitores siempre lleguen al servicio.
+_STATIC_CACHE_HEADERS = {'Cache-Control': 'public, max-age=3600'}
+
+_HEALTH_BODY = orjson.dumps({
+    'status': 'healthy',
+    'service': 'medical-diagnosis-service',
+    'version': '1.0.0'
+})
+
+AVAILABLE_SYMPTOMS = [
+    'fiebre', 'dolor_cabeza', 'nausea', 'fatiga', 'dolor_pecho',
+    'dificultad_respirar', 'dolor_abdominal', 'mareos', 'perdida_peso',
+    'tos', 'congestion_nasal', 'dolor_garganta', 'dolor_muscular',
+    'dolor_articular', 'erupcion_cutanea', 'sangrado', 'cambios_vision',
+    'confusion', 'convulsiones', 'dolor_espalda'
+]
+
+_SYMPTOMS_BODY = orjson.dumps({
+    'available_symptoms': AVAILABLE_SYMPTOMS,
+    'description': 'Lista de síntomas disponibles para diagnóstico',
+    'intensity_scale': '0-10 (0 = ausente, 10 = muy severo)'
+})
+
+_API_DOCS = {
+    'title': 'API de Diagnóstico Médico',
+    'version': '1.0.0',
+    'description': 'API para diagnóstico médico basado en síntomas del paciente',
+    'endpoints': {
+        'POST /predict': {
+            'description': 'Realiza predicción de diagnóstico médico',
+            'parameters': {
+                'symptoms': 'Diccionario con síntomas e intensidad (0-10)',
+                'example': {
+                    'fiebre': 8,
+                    'dolor_cabeza': 6,
+                    'nausea': 4
+                }
+            },
+            'response': {
+                'diagnosis': 'NO_ENFERMO | ENFERMEDAD_LEVE | ENFERMEDAD_AGUDA | ENFERMEDAD_CRONICA | ENFERMEDAD_TERMINAL',
+                'confidence': 'Confianza del diagnóstico (0-1)',
+                'most_likely_condition': 'Condición más probable',
+                'recommendations': 'Lista de recomendaciones'
+            }
+        },
+        'GET /health': {
+            'description': 'Health check del servicio'
+        },
+        'GET /symptoms': {
+            'description': 'Lista de síntomas disponibles'
+        }
+    }
+}
+
+_DOCS_BODY = orjson.dumps(_API_DOCS)
+
+
+def _to_float(value) -> float:
+    """
+    Convierte un valor de síntoma a float; si no se puede, devuelve 0.0.
+    Los números (caso habitual con JSON) se convierten sin pasar por try/except.
+    """
+    if type(value) is float:
+        return value
+    if type(value) is int:
+        return float(value)
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
 @app.route('/')
 def index():
     """Página principal con interfaz web para médicos"""
@@ -154,21 +464,14 @@ def predict():
                 'confidence': 0.0
             }), 400
         
-        # Convertir valores a float/int
-        symptoms = {}
-        for key, value in data.items():
-            try:
-                # Convertir a float si es posible
-                symptoms[key] = float(value)
-            except (ValueError, TypeError):
-                # Si no se puede convertir, usar 0
-                symptoms[key] = 0.0
+        # Convertir valores a float (0.0 si no se puede)
+        symptoms = {key: _to_float(value) for key, value in data.items()}
         
         # Realizar predicción
         result = predict_medical_diagnosis(symptoms)
 
         # Log de la predicción
-        logger.info(f"Predicción realizada: {result.get('diagnosis', 'ERROR')}")
+        logger.info("Predicción realizada: %s", result.get('diagnosis', 'ERROR'))
 
         # Registrar predicción en almacenamiento local (JSONL)
         try:
@@ -182,12 +485,12 @@ def predict():
             }
             _append_prediction_log(entry)
         except Exception as e:
-            logger.error(f"No se pudo registrar la predicción: {str(e)}")
+            logger.error("No se pudo registrar la predicción: %s", e)
 
-        return jsonify(result)
+        return _json_response(result)
         
     except Exception as e:
-        logger.error(f"Error en el endpoint /predict: {str(e)}")
+        logger.error("Error en el endpoint /predict: %s", e)
         return jsonify({
             'error': f'Error interno del servidor: {str(e)}',
             'diagnosis': 'ERROR',
@@ -197,80 +500,41 @@ def predict():
 @app.route('/health')
 def health_check():
     """Endpoint de health check para monitoreo"""
-    return jsonify({
-        'status': 'healthy',
-        'service': 'medical-diagnosis-service',
-        'version': '1.0.0'
-    })
+    return Response(_HEALTH_BODY, mimetype='application/json')
 
 @app.route('/symptoms')
 def get_available_symptoms():
     """Endpoint para obtener la lista de síntomas disponibles"""
-    available_symptoms = [
-        'fiebre', 'dolor_cabeza', 'nausea', 'fatiga', 'dolor_pecho',
-        'dificultad_respirar', 'dolor_abdominal', 'mareos', 'perdida_peso',
-        'tos', 'congestion_nasal', 'dolor_garganta', 'dolor_muscular',
-        'dolor_articular', 'erupcion_cutanea', 'sangrado', 'cambios_vision',
-        'confusion', 'convulsiones', 'dolor_espalda'
-    ]
-    
-    return jsonify({
-        'available_symptoms': available_symptoms,
-        'description': 'Lista de síntomas disponibles para diagnóstico',
-        'intensity_scale': '0-10 (0 = ausente, 10 = muy severo)'
-    })
+    return Response(_SYMPTOMS_BODY, mimetype='application/json', headers=_STATIC_CACHE_HEADERS)
 
 @app.route('/api/docs')
 def api_documentation():
     """Documentación de la API"""
-    docs = {
-        'title': 'API de Diagnóstico Médico',
-        'version': '1.0.0',
-        'description': 'API para diagnóstico médico basado en síntomas del paciente',
-        'endpoints': {
-            'POST /predict': {
-                'description': 'Realiza predicción de diagnóstico médico',
-                'parameters': {
-                    'symptoms': 'Diccionario con síntomas e intensidad (0-10)',
-                    'example': {
-                        'fiebre': 8,
-                        'dolor_cabeza': 6,
-                        'nausea': 4
-                    }
-                },
-                'response': {
-                    'diagnosis': 'NO_ENFERMO | ENFERMEDAD_LEVE | ENFERMEDAD_AGUDA | ENFERMEDAD_CRONICA | ENFERMEDAD_TERMINAL',
-                    'confidence': 'Confianza del diagnóstico (0-1)',
-                    'most_likely_condition': 'Condición más probable',
-                    'recommendations': 'Lista de recomendaciones'
-                }
-            },
-            'GET /health': {
-                'description': 'Health check del servicio'
-            },
-            'GET /symptoms': {
-                'description': 'Lista de síntomas disponibles'
-            }
-        }
-    }
-    
-    return jsonify(docs)
+    return Response(_DOCS_BODY, mimetype='application/json', headers=_STATIC_CACHE_HEADERS)
 
 
 @app.route('/api/report')
 def api_report():
     """Endpoint JSON con estadísticas de predicciones."""
-    entries = _read_prediction_log()
-    stats = _compute_prediction_stats(entries)
-    return jsonify(stats)
+    stats = _compute_prediction_stats(_refresh_report_cache())
+    return _json_response(stats)
 
 
 @app.route('/report')
 def report_view():
     """Vista HTML con reporte para médicos."""
-    entries = _read_prediction_log()
-    stats = _compute_prediction_stats(entries)
-    return render_template('report.html', stats=stats)
+    global _report_html_cache
+    cache = _refresh_report_cache()
+
+    # Si el log no cambió desde el último render, se reutiliza el HTML
+    cached = _report_html_cache
+    if cached is not None and cached[0] == cache['version']:
+        return Response(cached[1], mimetype='text/html')
+
+    stats = _compute_prediction_stats(cache)
+    html = render_template('report.html', stats=stats)
+    _report_html_cache = (cache['version'], html)
+    return Response(html, mimetype='text/html')
 
 @app.errorhandler(404)
 def not_found(error):
@@ -289,5 +553,5 @@ def internal_error(error):
     }), 500
 
 if __name__ == '__main__':
-    # Configuración para desarrollo
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # Servidor de desarrollo (en producción se usa gunicorn con wsgi.py)
+    app.run(host='0.0.0.0', port=5000, debug=os.getenv('FLASK_DEBUG') == '1', threaded=True)
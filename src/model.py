@@ -3,16 +3,69 @@ Módulo de diagnóstico médico para el sistema de MLOps
 Desarrollado para el taller de Pipeline de MLOps + Docker
 """
 
+import functools
 import logging
+import os
+from bisect import bisect_right
 from typing import Dict, List, Tuple, Union
 
-import numpy as np
-import pandas as pd
-
-# Configuración de logging
-logging.basicConfig(level=logging.INFO)
+# Configuración de logging (nivel configurable, p. ej. LOG_LEVEL=WARNING en producción)
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper())
 logger = logging.getLogger(__name__)
 
+# Umbrales de adjusted_score y categorías de severidad (ver determine_severity)
+SEVERITY_THRESHOLDS = (0.20, 0.50, 0.75, 0.93)
+SEVERITY_LEVELS = (
+    'NO_ENFERMO',
+    'ENFERMEDAD_LEVE',
+    'ENFERMEDAD_AGUDA',
+    'ENFERMEDAD_CRONICA',
+    'ENFERMEDAD_TERMINAL',
+)
+
+# Recomendaciones por severidad (ver _generate_recommendations)
+_RECOMMENDATIONS: Dict[str, Tuple[str, ...]] = {
+    'NO_ENFERMO': (
+        "No hay señales de gravedad actuales",
+        "Descansar adecuadamente",
+        "Mantener buena hidratación (agua, líquidos claros)",
+        "Observar si aparecen nuevos síntomas o si alguno empeora"
+    ),
+    'ENFERMEDAD_LEVE': (
+        "Síntomas compatibles con un cuadro leve",
+        "Mantener reposo y buena hidratación",
+        "Monitorear temperatura y respiración",
+        "Consultar a un profesional si persisten más de 48-72h o empeoran"
+    ),
+    'ENFERMEDAD_AGUDA': (
+        "CUADRO DE CUIDADO MÉDICO RECOMENDADO",
+        "Buscar valoración médica en las próximas 24 horas",
+        "Monitorear signos vitales (fiebre alta, dificultad respiratoria)",
+        "Evitar automedicación sin indicación profesional",
+        "Acudir a urgencias si hay empeoramiento rápido"
+    ),
+    'ENFERMEDAD_CRONICA': (
+        "ATENCIÓN MÉDICA URGENTE NECESARIA",
+        "Buscar atención especializada inmediatamente",
+        "Posible necesidad de intervención hospitalaria",
+        "Seguimiento médico continuo recomendado"
+    ),
+    'ENFERMEDAD_TERMINAL': (
+        "EMERGENCIA MÉDICA INMEDIATA",
+        "Llamar a servicios de urgencias ahora",
+        "No conducir; solicitar asistencia de terceros",
+        "Prepararse para soporte vital avanzado"
+    ),
+}
+
+_FALLBACK_RECOMMENDATIONS: Tuple[str, ...] = (
+    "Monitorear evolución de síntomas",
+    "Buscar orientación médica ante cualquier duda"
+)
+
+# Cantidad de payloads de síntomas distintos cuyo diagnóstico se memoiza
+DIAGNOSIS_CACHE_SIZE = 4096
+
 class MedicalDiagnosisModel:
     """
     Modelo de diagnóstico médico que simula la predicción de enfermedades
@@ -34,6 +87,9 @@ class MedicalDiagnosisModel:
     def __init__(self):
         self.symptom_weights = self._initialize_symptom_weights()
         self.disease_patterns = self._initialize_disease_patterns()
+        # Caché LRU del diagnóstico, indexado por los pares (síntoma, intensidad)
+        # del payload en su orden original
+        self._cached_diagnosis = functools.lru_cache(maxsize=DIAGNOSIS_CACHE_SIZE)(self._diagnose)
 
     def _initialize_symptom_weights(self) -> Dict[str, float]:
         """Pesos de importancia de cada síntoma."""
@@ -154,16 +210,8 @@ class MedicalDiagnosisModel:
         max_pattern_score = max(pattern_scores.values()) if pattern_scores else 0.0
         adjusted_score = (overall_score + max_pattern_score) / 2.0
 
-        if adjusted_score < 0.20:
-            severity_selected = 'NO_ENFERMO'
-        elif adjusted_score < 0.50:
-            severity_selected = 'ENFERMEDAD_LEVE'
-        elif adjusted_score < 0.75:
-            severity_selected = 'ENFERMEDAD_AGUDA'
-        elif adjusted_score < 0.93:
-            severity_selected = 'ENFERMEDAD_CRONICA'
-        else:
-            severity_selected = 'ENFERMEDAD_TERMINAL'
+        # bisect_right: un score igual al umbral pasa a la categoría superior
+        severity_selected = SEVERITY_LEVELS[bisect_right(SEVERITY_THRESHOLDS, adjusted_score)]
 
         return severity_selected, adjusted_score
 
@@ -174,6 +222,7 @@ class MedicalDiagnosisModel:
         """
         Pipeline completo:
         - valida input
+        - consulta la caché por los pares (síntoma, intensidad)
         - calcula puntaje de síntomas
         - detecta patrones
         - determina severidad
@@ -185,56 +234,23 @@ class MedicalDiagnosisModel:
             if not symptoms or len(symptoms) < 3:
                 raise ValueError("Se requieren al menos 3 síntomas para el diagnóstico")
 
-            # Score global de síntomas 
-            overall_score = self.calculate_symptom_score(symptoms)
-
-            # Coincidencia con patrones de enfermedad
-            pattern_scores = self.detect_disease_patterns(symptoms)
-
-            # Severidad clínica final
-            severity, adjusted_score = self.determine_severity(overall_score, pattern_scores)
-
-            # Enfermedad más probable (antes de filtrar)
-            most_likely_disease, most_likely_score = ("ninguna", 0.0)
-            if pattern_scores:
-                most_likely_disease, most_likely_score = max(
-                    pattern_scores.items(), key=lambda x: x[1]
-                )
-
-            # Reglas de coherencia con el front:
-            # - NO_ENFERMO: no mostramos condición específica
-            # - ENFERMEDAD_LEVE / ENFERMEDAD_AGUDA / ENFERMEDAD_CRONICA / ENFERMEDAD_TERMINAL:
-            #   * sí mostramos condición probable
-            if severity == "NO_ENFERMO":
-                show_condition = False
-                most_likely_disease = "ninguna"
-                most_likely_score = 0.0
-            else:
-                show_condition = True
-
-            recommendations = self._generate_recommendations(severity)
-
-            result = {
-                'diagnosis': severity,
-                'confidence': round(overall_score, 3),          # qué tan fuertes son los síntomas reportados (>0)
-                'severity_score': round(adjusted_score, 3),     # score combinado usado para clasificar
-                'most_likely_condition': most_likely_disease,   # ej. 'enfermedad_cardiaca'
-                'condition_confidence': round(most_likely_score, 3),
-                'show_condition': show_condition,             
-                'symptom_score': round(overall_score, 3),
-                'pattern_scores': {k: round(v, 3) for k, v in pattern_scores.items()},
-                'recommendations': recommendations,
-                'input_symptoms': symptoms
-            }
+            # El resultado depende solo de los pares del payload y de su orden
+            # (el orden de la suma del score global), así que se memoiza por ellos
+            result = dict(self._cached_diagnosis(tuple(symptoms.items())))
+            # Copia del dict anidado para que ningún llamador altere la caché
+            # (las recomendaciones ya son tuplas inmutables)
+            result['pattern_scores'] = dict(result['pattern_scores'])
+            result['input_symptoms'] = symptoms
 
             logger.info(
-                f"Diagnóstico generado: {severity} | score={adjusted_score:.3f} | "
-                f"condición={most_likely_disease if show_condition else 'N/A'}"
+                "Diagnóstico generado: %s | score=%.3f | condición=%s",
+                result['diagnosis'], result['severity_score'],
+                result['most_likely_condition'] if result['show_condition'] else 'N/A'
             )
             return result
 
         except Exception as e:
-            logger.error(f"Error en el diagnóstico: {str(e)}")
+            logger.error("Error en el diagnóstico: %s", e)
             return {
                 'error': str(e),
                 'diagnosis': 'ERROR',
@@ -243,7 +259,60 @@ class MedicalDiagnosisModel:
                 'recommendations': []
             }
 
-    def _generate_recommendations(self, severity: str) -> List[str]:
+    def _diagnose(
+        self,
+        items: Tuple[Tuple[str, Union[float, int]], ...]
+    ) -> Dict[str, Union[str, float, Dict, bool]]:
+        """
+        Núcleo determinista del diagnóstico a partir de los pares
+        (síntoma, intensidad) del payload (como tupla, para poder usarse como
+        clave de caché). No incluye 'input_symptoms', que se agrega en
+        predict_diagnosis.
+        """
+        symptoms = dict(items)
+
+        # Score global de síntomas
+        overall_score = self.calculate_symptom_score(symptoms)
+
+        # Coincidencia con patrones de enfermedad
+        pattern_scores = self.detect_disease_patterns(symptoms)
+
+        # Severidad clínica final
+        severity, adjusted_score = self.determine_severity(overall_score, pattern_scores)
+
+        # Enfermedad más probable (antes de filtrar)
+        most_likely_disease, most_likely_score = ("ninguna", 0.0)
+        if pattern_scores:
+            most_likely_disease, most_likely_score = max(
+                pattern_scores.items(), key=lambda x: x[1]
+            )
+
+        # Reglas de coherencia con el front:
+        # - NO_ENFERMO: no mostramos condición específica
+        # - ENFERMEDAD_LEVE / ENFERMEDAD_AGUDA / ENFERMEDAD_CRONICA / ENFERMEDAD_TERMINAL:
+        #   * sí mostramos condición probable
+        if severity == "NO_ENFERMO":
+            show_condition = False
+            most_likely_disease = "ninguna"
+            most_likely_score = 0.0
+        else:
+            show_condition = True
+
+        recommendations = self._generate_recommendations(severity)
+
+        return {
+            'diagnosis': severity,
+            'confidence': round(overall_score, 3),          # qué tan fuertes son los síntomas reportados (>0)
+            'severity_score': round(adjusted_score, 3),     # score combinado usado para clasificar
+            'most_likely_condition': most_likely_disease,   # ej. 'enfermedad_cardiaca'
+            'condition_confidence': round(most_likely_score, 3),
+            'show_condition': show_condition,
+            'symptom_score': round(overall_score, 3),
+            'pattern_scores': {k: round(v, 3) for k, v in pattern_scores.items()},
+            'recommendations': recommendations,
+        }
+
+    def _generate_recommendations(self, severity: str) -> Tuple[str, ...]:
         """
         Recomendaciones basadas en severidad clínica.
         NO_ENFERMO -> autocuidado básico.
@@ -251,54 +320,9 @@ class MedicalDiagnosisModel:
         ENFERMEDAD_AGUDA -> atención médica pronto.
         ENFERMEDAD_CRONICA -> urgente.
         ENFERMEDAD_TERMINAL -> emergencia inmediata.
+        Las tuplas son inmutables y se comparten entre respuestas.
         """
-        if severity == 'NO_ENFERMO':
-            return [
-                "No hay señales de gravedad actuales",
-                "Descansar adecuadamente",
-                "Mantener buena hidratación (agua, líquidos claros)",
-                "Observar si aparecen nuevos síntomas o si alguno empeora"
-            ]
-
-
-        if severity == 'ENFERMEDAD_LEVE':
-            return [
-                "Síntomas compatibles con un cuadro leve",
-                "Mantener reposo y buena hidratación",
-                "Monitorear temperatura y respiración",
-                "Consultar a un profesional si persisten más de 48-72h o empeoran"
-            ]
-
-        if severity == 'ENFERMEDAD_AGUDA':
-            return [
-                "CUADRO DE CUIDADO MÉDICO RECOMENDADO",
-                "Buscar valoración médica en las próximas 24 horas",
-                "Monitorear signos vitales (fiebre alta, dificultad respiratoria)",
-                "Evitar automedicación sin indicación profesional",
-                "Acudir a urgencias si hay empeoramiento rápido"
-            ]
-
-        if severity == 'ENFERMEDAD_CRONICA':
-            return [
-                "ATENCIÓN MÉDICA URGENTE NECESARIA",
-                "Buscar atención especializada inmediatamente",
-                "Posible necesidad de intervención hospitalaria",
-                "Seguimiento médico continuo recomendado"
-            ]
-
-        if severity == 'ENFERMEDAD_TERMINAL':
-            return [
-                "EMERGENCIA MÉDICA INMEDIATA",
-                "Llamar a servicios de urgencias ahora",
-                "No conducir; solicitar asistencia de terceros",
-                "Prepararse para soporte vital avanzado"
-            ]
-
-        # fallback
-        return [
-            "Monitorear evolución de síntomas",
-            "Buscar orientación médica ante cualquier duda"
-        ]
+        return _RECOMMENDATIONS.get(severity, _FALLBACK_RECOMMENDATIONS)
 
 
 # Instancia global reusable
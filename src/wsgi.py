@@ -0,0 +1,8 @@
+"""
+Punto de entrada WSGI para producción
+Uso: gunicorn -k gthread -w $(nproc) --threads 8 wsgi:app
+"""
+
+from app import app
+
+__all__ = ['app']
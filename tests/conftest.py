@@ -1,6 +1,7 @@
 # tests/conftest.py
 import os
 import sys
+import numpy as np
 import pytest
 
 # Asegura que podamos importar desde src/
@@ -9,13 +10,61 @@ SRC = os.path.join(ROOT, "src")
 if SRC not in sys.path:
     sys.path.insert(0, SRC)
 
-import app as app_module  
 
-@pytest.fixture
-def client(monkeypatch, tmp_path):
+@pytest.fixture(scope="session")
+def app_module():
     """
-    Crea un test client de Flask y redirige el log de predicciones
-    a una carpeta temporal para no tocar archivos reales.
+    Módulo `app` importado de forma diferida: la recolección de tests no carga
+    Flask ni el modelo hasta que un test seleccionado lo necesita.
+    """
+    import app
+    return app
+
+
+@pytest.fixture(scope="session")
+def client(app_module):
+    """
+    Test client de Flask compartido por toda la sesión (la app se construye
+    una sola vez). El aislamiento entre tests lo da `_isolated_report_state`.
+    """
+    app = app_module.app
+    app.config.update(TESTING=True)
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(scope="module", params=["py", "numpy"])
+def fake_predict(request):
+    """
+    Versión determinística de `predict_medical_diagnosis` para instalar con
+    monkeypatch en los tests de la API (se construye una vez por módulo).
+    Se parametriza para devolver escalares de Python o de NumPy, como hace
+    el modelo real, y verificar que ambos se serializan en la respuesta y el log.
+    """
+    if request.param == "numpy":
+        confidence, severity_score = np.float32(0.9), np.int8(2)
+    else:
+        confidence, severity_score = 0.9, 2
+
+    def _fake_predict_medical_diagnosis(symptoms: dict):
+        return {
+            "diagnosis": "ENFERMEDAD_LEVE",
+            "confidence": confidence,
+            "severity_score": severity_score,
+            "most_likely_condition": "Gripe",
+            "input_symptoms": symptoms,
+            "recommendations": ["Reposo", "Hidratación"]
+        }
+
+    return _fake_predict_medical_diagnosis
+
+
+@pytest.fixture(autouse=True)
+def _isolated_report_state(app_module, monkeypatch, tmp_path):
+    """
+    Redirige el log de predicciones a una carpeta temporal para no tocar
+    archivos reales y reinicia el estado en memoria del reporte, de modo que
+    cada test arranque con el reporte vacío.
     """
     # Redirige rutas de log a tmp
     log_dir = tmp_path / "data"
@@ -23,8 +72,10 @@ def client(monkeypatch, tmp_path):
     monkeypatch.setattr(app_module, "LOG_DIR", str(log_dir))
     monkeypatch.setattr(app_module, "LOG_FILE", str(log_file))
 
-    # Devuelve el cliente de pruebas
-    app = app_module.app
-    app.config.update(TESTING=True)
-    with app.test_client() as client:
-        yield client
+    # Reinicia caché del reporte y HTML renderizado
+    app_module.reset_report()
+
+    yield
+
+    # Vacía el escritor en segundo plano antes de restaurar las rutas de log
+    app_module._flush_prediction_log()
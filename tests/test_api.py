@@ -1,61 +1,220 @@
 # tests/test_api.py
-import json
-import app as app_module
-
-def test_report_inicial_vacio(client):
-    """Al inicio, /api/report debe estar vacío/por defecto."""
-    resp = client.get("/api/report")
-    assert resp.status_code == 200
-    data = resp.get_json()
-    assert data["counts_by_category"] == {}
-    assert data["last_5_predictions"] == []
-    assert data["last_prediction_date"] is None
-
-def test_predict_y_stats_actualizadas(client, monkeypatch):
-    """POST /predict debe registrar una predicción y /api/report reflejarla."""
-    # Simula el modelo para que devuelva un resultado determinístico
-    def fake_predict_medical_diagnosis(symptoms: dict):
-        return {
-            "diagnosis": "ENFERMEDAD_LEVE",
-            "confidence": 0.9,
-            "severity_score": 2,
-            "most_likely_condition": "Gripe",
-            "input_symptoms": symptoms,
-            "recommendations": ["Reposo", "Hidratación"]
-        }
-
-    # Reemplaza la función importada en app.py
-    monkeypatch.setattr(app_module, "predict_medical_diagnosis", fake_predict_medical_diagnosis)
-
-    # 1) Antes de predecir, el reporte está vacío (sanity check)
-    resp0 = client.get("/api/report")
+import os
+import threading
+from types import MappingProxyType, SimpleNamespace
+
+import orjson
+import pytest
+
+# Valores esperados y claves del reporte, definidos una sola vez
+_DIAG = "ENFERMEDAD_LEVE"
+_COND = "Gripe"
+_K_COUNTS = "counts_by_category"
+_K_LAST5 = "last_5_predictions"
+_K_DATE = "last_prediction_date"
+
+# Diagnosis esperado tal como aparece en el JSON crudo (clave del conteo y
+# valor en cada una de las últimas predicciones)
+_NEEDLE = b'"ENFERMEDAD_LEVE"'
+
+# Payload de síntomas: vista inmutable compartida entre tests y su versión
+# serializada una sola vez para los POST
+_PAYLOAD_DICT = MappingProxyType({
+    "fiebre": 8,
+    "dolor_cabeza": 6,
+    "nausea": 4
+})
+_PAYLOAD = orjson.dumps(dict(_PAYLOAD_DICT))
+
+
+def j(resp):
+    """Decodifica el cuerpo JSON de una respuesta con orjson."""
+    return orjson.loads(resp.data)
+
+@pytest.mark.parametrize("n", [1, 50])
+def test_report_flow(client, monkeypatch, fake_predict, app_module, n):
+    """
+    Flujo completo en una sola sesión del cliente: el reporte arranca vacío,
+    POST /predict registra `n` predicciones y /api/report las refleja.
+    Depende del fixture autouse `_isolated_report_state` (conftest), que
+    reinicia el reporte entre tests aunque el `client` sea de sesión.
+    """
+    # 1) Al inicio, /api/report debe estar vacío/por defecto. Se invoca la vista
+    #    directamente (sin el despacho WSGI); el paso 3 cubre la ruta HTTP.
+    with app_module.app.test_request_context("/api/report"):
+        resp0 = app_module.api_report()
     assert resp0.status_code == 200
-    data0 = resp0.get_json()
-    assert data0["counts_by_category"] == {}
+    data0 = j(resp0)
+    assert data0[_K_COUNTS] == {}
+    assert data0[_K_LAST5] == []
+    assert data0[_K_DATE] is None
+
+    # Reemplaza la función importada en app.py por el modelo simulado (conftest)
+    monkeypatch.setattr(app_module, "predict_medical_diagnosis", fake_predict)
 
     # 2) Hacemos una predicción
-    payload = {
-        "fiebre": 8,
-        "dolor_cabeza": 6,
-        "nausea": 4
-    }
-    resp1 = client.post("/predict", json=payload)
+    resp1 = client.post("/predict", data=_PAYLOAD, content_type="application/json")
     assert resp1.status_code == 200
-    pred = resp1.get_json()
-    assert pred["diagnosis"] == "ENFERMEDAD_LEVE"
-    assert pred["most_likely_condition"] == "Gripe"
-    assert "confidence" in pred
+    pred = SimpleNamespace(**j(resp1))
+    assert pred.diagnosis == _DIAG
+    assert pred.most_likely_condition == _COND
+    assert pred.confidence is not None
+    assert pred.input_symptoms == _PAYLOAD_DICT
+
+    # Resto de las predicciones con el mismo payload ya serializado
+    for _ in range(n - 1):
+        assert client.post("/predict", data=_PAYLOAD, content_type="application/json").status_code == 200
 
-    # 3) Ahora el reporte debe reflejar la predicción
+    # 3) Ahora el reporte debe reflejar la predicción (se decodifica una vez)
     resp2 = client.get("/api/report")
     assert resp2.status_code == 200
-    data2 = resp2.get_json()
+    data2 = j(resp2)
+    counts2 = data2[_K_COUNTS]
+    last_5 = data2[_K_LAST5]
+
+    # La categoría aparece una vez en los conteos y una vez por cada una de
+    # las últimas predicciones; se verifica sobre los bytes, sin decodificar
+    assert resp2.data.count(_NEEDLE) == 1 + min(n, 5)
 
     # Debe haber contado la categoría
-    assert "ENFERMEDAD_LEVE" in data2["counts_by_category"]
-    assert data2["counts_by_category"]["ENFERMEDAD_LEVE"] >= 1
+    assert counts2[_DIAG] == n
 
     # Debe existir última fecha y la última predicción arriba
-    assert data2["last_prediction_date"] is not None
-    assert len(data2["last_5_predictions"]) >= 1
-    assert data2["last_5_predictions"][0]["diagnosis"] == "ENFERMEDAD_LEVE"
+    assert data2[_K_DATE] is not None
+    assert len(last_5) == min(n, 5)
+
+
+def test_report_html_se_actualiza_tras_nueva_prediccion(client, monkeypatch, fake_predict, app_module):
+    """
+    /report reutiliza el HTML renderizado mientras el log no cambia y lo
+    vuelve a renderizar en cuanto se registra una predicción nueva.
+    """
+    first = client.get("/report")
+    assert first.status_code == 200
+    rendered = app_module._report_html_cache
+
+    second = client.get("/report")
+    assert second.data == first.data
+    assert app_module._report_html_cache is rendered
+    assert _COND.encode() not in second.data
+
+    monkeypatch.setattr(app_module, "predict_medical_diagnosis", fake_predict)
+    assert client.post("/predict", data=_PAYLOAD, content_type="application/json").status_code == 200
+
+    third = client.get("/report")
+    assert third.status_code == 200
+    assert third.data != second.data
+    assert _DIAG.encode() in third.data
+    assert _COND.encode() in third.data
+
+
+def _write_log(app_module, *lines: bytes, mode: str = "ab") -> None:
+    """Escribe líneas crudas (bytes) en el log temporal de predicciones."""
+    os.makedirs(app_module.LOG_DIR, exist_ok=True)
+    with open(app_module.LOG_FILE, mode) as f:
+        f.write(b"".join(lines))
+
+
+def _log_line(diagnosis: str, timestamp: str = "2025-01-01T00:00:00+00:00") -> bytes:
+    return orjson.dumps({"timestamp": timestamp, "diagnosis": diagnosis}) + b"\n"
+
+
+def test_report_incremental_retiene_linea_a_medio_escribir(app_module):
+    """Una última línea sin '\\n' no se cuenta ni avanza el offset hasta completarse."""
+    first = _log_line("A")
+    partial = _log_line("B")
+    _write_log(app_module, first, partial[:10])
+
+    cache = app_module._refresh_report_cache()
+    assert cache["counter"] == {"A": 1}
+    assert app_module._REPORT_CACHE["offset"] == len(first)
+
+    _write_log(app_module, partial[10:])
+    cache = app_module._refresh_report_cache()
+    assert cache["counter"] == {"A": 1, "B": 1}
+    assert app_module._REPORT_CACHE["offset"] == len(first) + len(partial)
+
+
+def test_report_incremental_se_reinicia_si_el_log_se_trunca(app_module):
+    _write_log(app_module, _log_line("A"), _log_line("A"))
+    assert app_module._refresh_report_cache()["counter"] == {"A": 2}
+
+    line = _log_line("B")
+    _write_log(app_module, line, mode="wb")
+    assert app_module._refresh_report_cache()["counter"] == {"B": 1}
+    assert app_module._REPORT_CACHE["offset"] == len(line)
+
+
+def test_report_incremental_se_reinicia_si_cambia_log_file(app_module, monkeypatch, tmp_path):
+    _write_log(app_module, _log_line("A"))
+    assert app_module._refresh_report_cache()["counter"] == {"A": 1}
+
+    other = tmp_path / "otro" / "predictions_log.jsonl"
+    monkeypatch.setattr(app_module, "LOG_DIR", str(other.parent))
+    monkeypatch.setattr(app_module, "LOG_FILE", str(other))
+    _write_log(app_module, _log_line("B"), _log_line("B"))
+
+    assert app_module._refresh_report_cache()["counter"] == {"B": 2}
+    assert app_module._REPORT_CACHE["path"] == str(other)
+
+
+def test_report_incremental_ignora_lineas_malformadas(app_module):
+    good = _log_line("A")
+    bad = b"{no es json\n"
+    _write_log(app_module, good, bad, b"\n", good)
+
+    assert app_module._refresh_report_cache()["counter"] == {"A": 2}
+    # Las líneas inválidas se consumen igual: no se releen en la próxima lectura
+    assert app_module._REPORT_CACHE["offset"] == 2 * len(good) + len(bad) + 1
+
+
+def test_report_empates_de_timestamp_prefieren_lineas_nuevas(app_module):
+    """Con timestamps iguales, las últimas 5 son las escritas más tarde."""
+    _write_log(app_module, *(_log_line(f"D{i}") for i in range(4)))
+    app_module._refresh_report_cache()
+    _write_log(app_module, *(_log_line(f"D{i}") for i in range(4, 7)))
+
+    recent = app_module._refresh_report_cache()["recent"]
+    assert [e["diagnosis"] for e in recent] == ["D6", "D5", "D4", "D3", "D2"]
+
+
+def test_report_cuenta_lineas_json_con_tipos_inesperados(app_module):
+    """Líneas JSON válidas con tipos raros o NaN (logs antiguos) se cuentan."""
+    _write_log(
+        app_module,
+        b'{"diagnosis": "X", "confidence": "bad"}\n',
+        b'{"timestamp": "2025-01-01T00:00:00+00:00", "diagnosis": "X", "confidence": NaN}\n',
+        b'{"timestamp": "2025-01-01T00:00:01+00:00", "confidence": 0.5}\n',
+    )
+
+    counts = app_module._refresh_report_cache()["counter"]
+    assert counts == {"X": 2, "DESCONOCIDO": 1}
+
+
+@pytest.mark.parametrize("symptoms, expected", [
+    # Casos cuyo adjusted_score queda en torno a un umbral; lo esperado es la
+    # salida del modelo escalar original (el orden de la suma decide el caso)
+    ({"mareos": 4, "perdida_peso": 5, "convulsiones": 1,
+      "dolor_articular": 1, "dolor_muscular": 6}, "ENFERMEDAD_LEVE"),
+    ({"nausea": 8, "mareos": 7, "perdida_peso": 5, "tos": 10}, "ENFERMEDAD_LEVE"),
+    ({"tos": 0, "fatiga": 3, "perdida_peso": 3}, "NO_ENFERMO"),
+])
+def test_predict_en_umbral_de_severidad(client, symptoms, expected):
+    """Los casos en el umbral se clasifican igual que el modelo escalar original."""
+    r = client.post("/predict", data=orjson.dumps(symptoms), content_type="application/json")
+    assert r.status_code == 200
+    assert j(r)["diagnosis"] == expected
+
+
+def test_flush_del_log_tiene_limite_si_el_escritor_se_traba(app_module, monkeypatch, caplog):
+    """Con el escritor bloqueado, el flush de los reportes vuelve tras el timeout."""
+    gate = threading.Event()
+    monkeypatch.setattr(app_module, "LOG_FLUSH_TIMEOUT", 0.05)
+    # El escritor reabre el log (LOG_FILE cambió en este test) y queda bloqueado
+    monkeypatch.setattr(app_module, "_ensure_log_dir", gate.wait)
+    try:
+        app_module._append_prediction_log({"diagnosis": _DIAG})
+        app_module._flush_prediction_log()
+        assert "no se vació" in caplog.text
+    finally:
+        gate.set()
@@ -0,0 +1,110 @@
+# tests/test_model.py
+import itertools
+import random
+
+import pytest
+
+# Tríos de síntomas que comparten patrones de enfermedad (empates y umbrales)
+_GRID_SYMPTOMS = [
+    ("fiebre", "tos", "congestion_nasal"),
+    ("nausea", "dolor_abdominal", "fatiga"),
+    ("dolor_cabeza", "mareos", "dolor_pecho"),
+    ("perdida_peso", "fatiga", "cambios_vision"),
+    ("dolor_articular", "dolor_muscular", "erupcion_cutanea"),
+    ("confusion", "convulsiones", "mareos"),
+]
+_GRID_VALUES = (0, 1, 3, 5, 7, 10)
+
+
+@pytest.fixture(scope="module")
+def model_module():
+    import model
+    return model
+
+
+def _reference_diagnosis(model_module, symptoms: dict) -> dict:
+    """
+    Implementación escalar de referencia: mismas fórmulas y mismo orden de
+    suma que los loops originales sobre dicts.
+    """
+    weights = model_module.diagnosis_model.symptom_weights
+    patterns = model_module.diagnosis_model.disease_patterns
+
+    total_score = total_weight = 0.0
+    for symptom, intensity in symptoms.items():
+        if symptom in weights and intensity is not None and intensity > 0:
+            total_score += min(max(float(intensity) / 10.0, 0.0), 1.0) * weights[symptom]
+            total_weight += weights[symptom]
+    overall = total_score / total_weight if total_weight else 0.0
+
+    pattern_scores = {}
+    for disease, pattern in patterns.items():
+        score = 0.0
+        for symptom in pattern:
+            if symptom in symptoms and symptoms[symptom] > 0:
+                score += min(max(symptoms[symptom] / 10.0, 0.0), 1.0) * weights.get(symptom, 0.5)
+        pattern_scores[disease] = score / len(pattern) if pattern else 0.0
+
+    adjusted = (overall + max(pattern_scores.values())) / 2.0
+    if adjusted < 0.20:
+        diagnosis = "NO_ENFERMO"
+    elif adjusted < 0.50:
+        diagnosis = "ENFERMEDAD_LEVE"
+    elif adjusted < 0.75:
+        diagnosis = "ENFERMEDAD_AGUDA"
+    elif adjusted < 0.93:
+        diagnosis = "ENFERMEDAD_CRONICA"
+    else:
+        diagnosis = "ENFERMEDAD_TERMINAL"
+
+    condition, condition_score = max(pattern_scores.items(), key=lambda x: x[1])
+    if diagnosis == "NO_ENFERMO":
+        condition, condition_score = "ninguna", 0.0
+
+    return {
+        "diagnosis": diagnosis,
+        "confidence": round(overall, 3),
+        "severity_score": round(adjusted, 3),
+        "most_likely_condition": condition,
+        "condition_confidence": round(condition_score, 3),
+        "pattern_scores": {k: round(v, 3) for k, v in pattern_scores.items()},
+    }
+
+
+def _grid_inputs():
+    for names in _GRID_SYMPTOMS:
+        for values in itertools.product(_GRID_VALUES, repeat=len(names)):
+            yield dict(zip(names, values))
+    # Payloads aleatorios (semilla fija) con 3-8 síntomas en orden arbitrario
+    rng = random.Random(0)
+    all_names = ["fiebre", "dolor_cabeza", "nausea", "fatiga", "dolor_pecho",
+                 "dificultad_respirar", "dolor_abdominal", "mareos", "perdida_peso",
+                 "tos", "congestion_nasal", "dolor_garganta", "dolor_muscular",
+                 "dolor_articular", "erupcion_cutanea", "sangrado", "cambios_vision",
+                 "confusion", "convulsiones", "dolor_espalda"]
+    for _ in range(3000):
+        names = rng.sample(all_names, rng.randint(3, 8))
+        yield {name: rng.randint(0, 10) for name in names}
+
+
+def test_modelo_coincide_con_referencia_escalar(model_module):
+    """El modelo (con caché) da exactamente los mismos resultados que la referencia."""
+    for symptoms in _grid_inputs():
+        result = model_module.predict_medical_diagnosis(symptoms)
+        expected = _reference_diagnosis(model_module, symptoms)
+        assert {k: result[k] for k in expected} == expected, symptoms
+
+
+def test_resultado_memoizado_no_se_altera_desde_el_llamador(model_module):
+    """Mutar pattern_scores de un resultado no contamina la caché de diagnósticos."""
+    symptoms = {"fiebre": 8, "tos": 6, "congestion_nasal": 4}
+    first = model_module.predict_medical_diagnosis(symptoms)
+    expected = dict(first["pattern_scores"])
+
+    first["pattern_scores"]["infeccion_respiratoria"] = -1.0
+    first["pattern_scores"].clear()
+    first["diagnosis"] = "ALTERADO"
+
+    second = model_module.predict_medical_diagnosis(symptoms)
+    assert second["pattern_scores"] == expected
+    assert second["diagnosis"] != "ALTERADO"